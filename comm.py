@@ -5,14 +5,15 @@ An example using the Python rdscom library.
 This example mirrors the provided C++ example.
 """
 
+import os
 import sys
 import time
+from collections import deque
+from typing import Callable, Deque, Tuple
 from rdscom import (
-    Result,
-    default_error_callback,
+    FieldError,
     DataFieldType,
     DataPrototype,
-    DataBuffer,
     MessageType,
     Message,
     DummyChannel,
@@ -29,6 +30,14 @@ MESSAGE_TYPE_CAR = 1
 NUM_RETRIES = 3
 RETRY_DELAY = 2000  # milliseconds
 
+# Enum members used by the callbacks, bound once.
+_REQ = MessageType.REQUEST
+_RESP = MessageType.RESPONSE
+
+# Print received messages from inside the callbacks instead of deferring them
+# to the main loop.
+VERBOSE = False
+
 # ---------------------------------------------------------------------------
 #                           GLOBAL OBJECTS
 # ---------------------------------------------------------------------------
@@ -36,8 +45,9 @@ RETRY_DELAY = 2000  # milliseconds
 g_channel = DummyChannel()
 
 # Define a time function that returns the current time in milliseconds.
-def current_millis() -> int:
-    return int(time.time() * 1000)
+# A monotonic clock keeps the retry/ack timing immune to wall-clock changes.
+def current_millis(_monotonic_ns: Callable[[], int] = time.monotonic_ns) -> int:
+    return _monotonic_ns() // 1_000_000
 
 # Create options using the number of retries, the retry delay, and our time function.
 g_options = CommunicationInterfaceOptions(NUM_RETRIES, RETRY_DELAY, current_millis)
@@ -45,58 +55,61 @@ g_options = CommunicationInterfaceOptions(NUM_RETRIES, RETRY_DELAY, current_mill
 # Create the communication interface.
 g_com = CommunicationInterface(g_channel, g_options)
 
+# Received messages waiting to be printed, as (name, message) pairs.
+_log: Deque[Tuple[str, Message]] = deque(maxlen=4096)
+
 # ---------------------------------------------------------------------------
-#                           CALLBACKS
+#                           HELPERS
 # ---------------------------------------------------------------------------
-def on_person_message(message: Message) -> None:
-    print("Received person message")
+def print_error(error: str) -> None:
+    # Write straight to the stderr file descriptor, skipping sys.stderr's
+    # locking and buffering.
+    os.write(2, (error + "\n").encode())
+
+
+def print_message(name: str, message: Message) -> None:
+    print("Received " + name + " message")
     message.print_clean(sys.stdout)
 
-    # Get the car prototype from the communication interface.
-    proto_car_result = g_com.get_prototype(MESSAGE_TYPE_CAR)
-    if proto_car_result.is_error():
-        print("Error: missing prototype for car", file=sys.stderr)
-        return
 
-    # Create a response message (of type REQUEST) with the car prototype.
-    response = Message.from_type_and_proto(MessageType.REQUEST, proto_car_result.value())
+def log_message(name: str, message: Message) -> None:
+    if VERBOSE:
+        print_message(name, message)
+    else:
+        _log.append((name, message))
 
-    # Set the fields: make, model, and year.
-    res_make = response.set_field("make", 1)
-    res_model = response.set_field("model", 2)
-    res_year = response.set_field("year", 2020)
-    if Result.check(default_error_callback(sys.stderr), res_make, res_model, res_year):
-        print("Error setting fields", file=sys.stderr)
-        return
 
-    # Send the response message and require an acknowledgment.
-    g_com.send_message(response, ack_required=True)
+def flush_log() -> None:
+    while _log:
+        print_message(*_log.popleft())
 
 
-def on_car_message(message: Message) -> None:
-    print("Received car message")
-    message.print_clean(sys.stdout)
+# ---------------------------------------------------------------------------
+#                           CALLBACKS
+# ---------------------------------------------------------------------------
+def on_person_message(message: Message) -> None:
+    log_message("person", message)
 
-    # Get the person prototype.
-    proto_person_result = g_com.get_prototype(MESSAGE_TYPE_PERSON)
-    if proto_person_result.is_error():
-        print("Error: missing prototype for person", file=sys.stderr)
-        return
+    # Send a car message (of type REQUEST) with the fields make, model, and
+    # year, and require an acknowledgment.
+    res = g_com.send_built(MESSAGE_TYPE_CAR, _REQ, (1, 2, 2020), ack_required=True)
+    if res.is_error():
+        print_error("Error: " + res.error())
+        print_error("Error sending car message")
 
-    # Create a response message of type RESPONSE.
-    # Note: The C++ code passes a prototype, but in our Python version
-    # Message.create_response expects a DataBuffer. We build a DataBuffer from the prototype.
-    response = Message.create_response(message, DataBuffer(proto_person_result.value()))
 
-    # Set the fields: id and age.
-    res_id = response.set_field("id", 1)
-    res_age = response.set_field("age", 30)
-    if Result.check(default_error_callback(sys.stderr), res_id, res_age):
-        print("Error setting fields", file=sys.stderr)
-        return
+def on_car_message(message: Message) -> None:
+    log_message("car", message)
 
-    # Send the response (ack not required for a RESPONSE message).
-    g_com.send_message(response)
+    # Respond with a person message (of type RESPONSE) carrying the fields id
+    # and age. Reusing the request's message number makes it the ack.
+    # (Ack not required for a RESPONSE message.)
+    res = g_com.send_built(
+        MESSAGE_TYPE_PERSON, _RESP, (1, 30), message_number=message.message_number()
+    )
+    if res.is_error():
+        print_error("Error: " + res.error())
+        print_error("Error sending person message")
 
 
 # ---------------------------------------------------------------------------
@@ -127,16 +140,18 @@ def main() -> int:
     # Create an initial message (of type REQUEST) using the car prototype.
     car_proto_result = g_com.get_prototype(MESSAGE_TYPE_CAR)
     if car_proto_result.is_error():
-        print("Error: missing prototype for car", file=sys.stderr)
+        print_error("Error: missing prototype for car")
         return 1
     msg = Message.from_type_and_proto(MessageType.REQUEST, car_proto_result.value())
 
     # Set the fields for the car message.
-    res_make = msg.set_field("make", 1)
-    res_model = msg.set_field("model", 2)
-    res_year = msg.set_field("year", 2020)
-    if Result.check(default_error_callback(sys.stderr), res_make, res_model, res_year):
-        print("Error setting fields", file=sys.stderr)
+    try:
+        msg.set_field_strict("make", 1)
+        msg.set_field_strict("model", 2)
+        msg.set_field_strict("year", 2020)
+    except FieldError as e:
+        print_error("Error: " + str(e))
+        print_error("Error setting fields")
         return 1
 
     # Send the initial message with ack required.
@@ -144,15 +159,17 @@ def main() -> int:
 
     # Main loop.
     while True:
-        # Process any incoming messages and handle acks/retries.
+        # Wait until the channel has data (or a second passes), then process
+        # every frame that has arrived and handle acks/retries in one tick.
+        g_channel.wait(1.0)
         g_com.tick()
 
-        # Sleep for a bit.
-        time.sleep(1)
+        # Print whatever the callbacks received during this tick.
+        flush_log()
 
         # Check if no messages have been received for more than 2 seconds.
-        if g_com.time_since_last_received() > 2000:
-            print("No messages received in 2 seconds -- this shouldn't happen in this program", file=sys.stderr)
+        if current_millis() - g_com.last_received_ms > 2000:
+            print_error("No messages received in 2 seconds -- this shouldn't happen in this program")
             return 1
 
     # (In a real program you might break out of the loop; here it runs indefinitely.)
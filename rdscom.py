@@ -13,13 +13,18 @@ import sys
 import time
 import struct
 import enum
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Generic
+import heapq
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar, Generic, Union
 
 # ---------------------------------------------------------------------------
 #                           VERSION & DEBUG SETTINGS
 # ---------------------------------------------------------------------------
 RDSCOM_VERSION = "0.1.0"
 RDSCOM_DEBUG_ENABLED = False
+# Check messages built by hand for common mistakes (set False in production)
+RDSCOM_STRICT_WARNINGS = True
 
 # ANSI color codes for debugging (if enabled)
 RDSCOM_COLOR_PURPLE = "\033[95m"
@@ -83,6 +88,8 @@ T = TypeVar("T")
 
 
 class Result(Generic[T]):
+    __slots__ = ("_value", "_error", "_error_message")
+
     def __init__(
         self, value: Optional[T] = None, error: bool = False, error_message: str = ""
     ):
@@ -130,6 +137,15 @@ class Result(Generic[T]):
         return error
 
 
+# Shared success result for operations that have no value to return.
+_OK_EMPTY: Result[None] = Result.ok(None)
+
+
+class FieldError(Exception):
+    # Raised by the *_strict field accessors instead of returning an error Result.
+    pass
+
+
 # ---------------------------------------------------------------------------
 #                           DATA FIELDS & PROTOTYPES
 # ---------------------------------------------------------------------------
@@ -152,9 +168,14 @@ class DataFieldType(enum.Enum):
 
 
 class DataField:
+    __slots__ = ("offset", "type", "_struct", "_size")
+
     def __init__(self, offset: int = 0, type_: DataFieldType = DataFieldType.NONE):
         self.offset = offset
         self.type = type_
+        # Compiled struct for this field's type (None for NONE), looked up once.
+        self._struct: Optional[struct.Struct] = _type_struct.get(type_)
+        self._size = DataField.get_size_of_type(type_)
 
     @classmethod
     def get_size_of_type(cls, type_: DataFieldType) -> int:
@@ -175,7 +196,7 @@ class DataField:
             return 0
 
     def size(self) -> int:
-        return DataField.get_size_of_type(self.type)
+        return self._size
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, DataField):
@@ -189,12 +210,25 @@ class DataField:
 # Reserved identifier for error prototypes
 RESERVED_ERROR_PROTOTYPE = 80
 
+# Maximum number of released buffers kept for reuse per prototype
+BUFFER_POOL_SIZE = 16
+
+# Maximum number of released messages kept for reuse
+MESSAGE_POOL_SIZE = 16
+
 
 class DataPrototype:
     def __init__(self, identifier: int = RESERVED_ERROR_PROTOTYPE):
         self._identifier = identifier  # Should be 0-255
         self._size = 0
         self._fields: Dict[str, DataField] = {}
+        self._buffer_pool: Deque["DataBuffer"] = deque(maxlen=BUFFER_POOL_SIZE)
+        # Derived field metadata, built lazily and reset whenever a field is added.
+        self._field_names: Optional[Tuple[str, ...]] = None
+        self._ordered_fields: Optional[Tuple[Tuple[str, DataField], ...]] = None
+        self._packer: Optional[struct.Struct] = None
+        self._format: Optional[bytes] = None
+        self._update_frame_size()
 
     @classmethod
     def from_serialized_format(cls, serialized: bytes) -> Result["DataPrototype"]:
@@ -222,26 +256,46 @@ class DataPrototype:
             field_type = DataFieldType(type_val)
             proto._fields[name] = DataField(proto._size, field_type)
             proto._size += proto._fields[name].size()
+        proto._update_frame_size()
         return Result.ok(proto)
 
     def serialize_format(self) -> bytearray:
-        serialized = bytearray()
-        serialized.append(self._identifier)
-        serialized.append(len(self._fields))
-        for name, field in self._fields.items():
-            name_bytes = name.encode("utf-8")
-            serialized.append(len(name_bytes))
-            serialized.extend(name_bytes)
-            serialized.append(field.type.value)
-        return serialized
+        # The field names are only encoded the first time; afterwards this is a
+        # single copy of the cached format.
+        if self._format is None:
+            serialized = bytearray()
+            serialized.append(self._identifier)
+            serialized.append(len(self._fields))
+            for name, field in self._fields.items():
+                name_bytes = name.encode("utf-8")
+                serialized.append(len(name_bytes))
+                serialized.extend(name_bytes)
+                serialized.append(field.type.value)
+            self._format = bytes(serialized)
+        return bytearray(self._format)
 
     def add_field(self, name: str, field_type: DataFieldType) -> "DataPrototype":
         if name in self._fields:
             self._size -= self._fields[name].size()
         self._fields[name] = DataField(self._size, field_type)
         self._size += self._fields[name].size()
+        self._update_frame_size()
+        self._field_names = None
+        self._ordered_fields = None
+        self._packer = None
+        self._format = None
         return self
 
+    def _update_frame_size(self) -> None:
+        # Size of a complete message frame carrying this prototype, and where its
+        # end sequence starts, so received frames are checked without recomputing.
+        self._frame_size = (
+            Message._complete_header_size + self._size + Message._complete_end_sequence_size
+        )
+        self._end_slice_start = self._frame_size - Message._end_sequence_size
+        # Zeroed payload copied over reused buffers by acquire_buffer().
+        self._zero = bytes(self._size)
+
     def find_field(self, name: str) -> Result[DataField]:
         if name not in self._fields:
             return Result.errorResult("Field not found: " + name)
@@ -256,8 +310,64 @@ class DataPrototype:
     def identifier(self) -> int:
         return self._identifier
     
-    def field_names(self) -> List[str]:
-        return list(self._fields.keys())
+    def field_names(self) -> Tuple[str, ...]:
+        if self._field_names is None:
+            self._field_names = tuple(self._fields)
+        return self._field_names
+
+    def ordered_fields(self) -> Tuple[Tuple[str, DataField], ...]:
+        # (name, field) pairs ordered by offset.
+        if self._ordered_fields is None:
+            self._ordered_fields = tuple(
+                sorted(self._fields.items(), key=lambda item: item[1].offset)
+            )
+        return self._ordered_fields
+
+    def packer(self) -> struct.Struct:
+        # A compiled struct covering every field, ordered by offset.
+        if self._packer is None:
+            self._packer = struct.Struct(
+                "=" + "".join(_type_format.get(field.type, "") for _, field in self.ordered_fields())
+            )
+        return self._packer
+
+    def build(self, *values: Any) -> Result["DataBuffer"]:
+        # Pack all field values (in field order) into a pooled buffer at once.
+        packer = self.packer()
+        if packer.size != self._size:
+            return Result.errorResult("Field layout mismatch for prototype: " + str(self._identifier))
+        # Every byte is packed below, so a reused buffer needs no zeroing.
+        buffer = self._take_buffer()
+        try:
+            packer.pack_into(buffer._data, 0, *values)
+        except struct.error as e:
+            return Result.errorResult("Struct pack error: " + str(e))
+        return Result.ok(buffer)
+
+    def acquire_buffer(self) -> "DataBuffer":
+        # Reuse a previously released buffer if there is one, cleared like a new one.
+        if self._buffer_pool:
+            buffer = self._take_buffer()
+            buffer._data[:] = self._zero
+            return buffer
+        return self._take_buffer()
+
+    def _take_buffer(self) -> "DataBuffer":
+        # Like acquire_buffer, but a reused buffer keeps its old contents.
+        buffer = self._buffer_pool.pop() if self._buffer_pool else DataBuffer(self)
+        buffer._pooled = True
+        return buffer
+
+    def release_buffer(self, buffer: "DataBuffer") -> None:
+        # Only buffers currently acquired from this prototype are taken back, so
+        # releasing a buffer twice is harmless. Buffers from before a field was
+        # added no longer fit the prototype.
+        if not buffer._pooled or buffer._type is not self:
+            return
+        buffer._pooled = False
+        if len(buffer._data) != self._size:
+            return
+        self._buffer_pool.append(buffer)
 
     def __repr__(self) -> str:
         return f"DataPrototype(identifier={self._identifier}, size={self._size}, fields={self._fields})"
@@ -279,8 +389,15 @@ _type_format: Dict[DataFieldType, str] = {
     DataFieldType.DOUBLE: "d",
 }
 
+# Precompiled structs for each field type, so formats are only parsed once.
+_type_struct: Dict[DataFieldType, struct.Struct] = {
+    type_: struct.Struct(fmt) for type_, fmt in _type_format.items()
+}
+
 
 class DataBuffer:
+    __slots__ = ("_type", "_data", "_pooled")
+
     def __init__(self, proto: Optional[DataPrototype] = None):
         if proto is None:
             # Create an "empty" buffer.
@@ -289,6 +406,8 @@ class DataBuffer:
         else:
             self._type = proto
             self._data = bytearray(proto.size())
+        # Set while the buffer is checked out by DataPrototype.acquire_buffer().
+        self._pooled = False
 
     @classmethod
     def create_from_prototype(
@@ -304,49 +423,83 @@ class DataBuffer:
         buffer._data = bytearray(data)
         return Result.ok(buffer)
 
+    @classmethod
+    def from_view(cls, proto: DataPrototype, data: memoryview) -> Result["DataBuffer"]:
+        # Like create_from_prototype, but reads straight out of data without
+        # copying it. The buffer makes its own copy the first time it is written.
+        if proto.identifier() == RESERVED_ERROR_PROTOTYPE:
+            return Result.errorResult("Invalid prototype: " + str(proto.identifier()))
+        if len(data) != proto.size():
+            return Result.errorResult(
+                f"Data size mismatch, expected: {proto.size()}, got: {len(data)}"
+            )
+        buffer = cls.__new__(cls)
+        buffer._type = proto
+        buffer._data = data.toreadonly()
+        buffer._pooled = False
+        return Result.ok(buffer)
+
     def get_field(self, name: str) -> Result[Any]:
-        # Look up the field in the prototype.
-        field_res = self._type.find_field(name)
-        if field_res.is_error():
-            return Result.errorResult(field_res.error())
-        field = field_res.value()
-        expected_size = field.size()
-        # Get the appropriate format string.
-        try:
-            fmt = _type_format[field.type]
-        except KeyError:
+        # Look up the field in the prototype, skipping find_field's Result.
+        field = self._type._fields.get(name)
+        if field is None:
+            return Result.errorResult("Field not found: " + name)
+        if field._struct is None:
             return Result.errorResult("Unsupported field type for field: " + name)
-        if struct.calcsize(fmt) != expected_size:
-            return Result.errorResult("Field size mismatch: " + name)
         # Unpack from the data buffer (using native endianness)
         try:
-            # struct.unpack returns a tuple
-            value = struct.unpack_from(fmt, self._data, field.offset)[0]
+            # unpack_from returns a tuple
+            value = field._struct.unpack_from(self._data, field.offset)[0]
         except struct.error as e:
             return Result.errorResult("Struct unpack error: " + str(e))
         return Result.ok(value)
 
     def set_field(self, name: str, value: Any) -> Result[Any]:
-        field_res = self._type.find_field(name)
-        if field_res.is_error():
-            return Result.errorResult(field_res.error())
-        field = field_res.value()
-        expected_size = field.size()
-        try:
-            fmt = _type_format[field.type]
-        except KeyError:
-            return Result.errorResult("Unsupported field type for field: " + name)
-        if struct.calcsize(fmt) != expected_size:
-            return Result.errorResult("Field size mismatch: " + name)
+        error = self._set_field(name, value)
+        if error:
+            return Result.errorResult(error)
+        return Result.ok(value)
+
+    def set_field_strict(self, name: str, value: Any) -> None:
+        # Like set_field, but raises FieldError instead of allocating a Result.
+        error = self._set_field(name, value)
+        if error:
+            raise FieldError(error)
+
+    def set_fields(self, **values: Any) -> Result[None]:
+        # Set several fields at once, reporting every failure in a single Result.
+        errors: List[str] = []
+        for name, value in values.items():
+            error = self._set_field(name, value)
+            if error:
+                errors.append(error)
+        if errors:
+            return Result.errorResult("\n".join(errors))
+        return _OK_EMPTY
+
+    def _set_field(self, name: str, value: Any) -> str:
+        # Returns an error message, or an empty string on success.
+        field = self._type._fields.get(name)
+        if field is None:
+            return "Field not found: " + name
+        if field._struct is None:
+            return "Unsupported field type for field: " + name
+        if not isinstance(self._data, bytearray):
+            # Detach from the frame this buffer was parsed from on the first write.
+            self._data = bytearray(self._data)
+        # Pack first and copy after: pack_into clears its target before
+        # validating, which would wipe the old value when packing fails.
         try:
-            packed = struct.pack(fmt, value)
+            packed = field._struct.pack(value)
         except struct.error as e:
-            return Result.errorResult("Struct pack error: " + str(e))
-        # Copy the packed bytes into the data buffer.
-        self._data[field.offset : field.offset + expected_size] = packed
-        return Result.ok(value)
+            return "Struct pack error: " + str(e)
+        self._data[field.offset : field.offset + field._size] = packed
+        return ""
 
     def data(self) -> bytearray:
+        if not isinstance(self._data, bytearray):
+            # Detach from the frame this buffer was parsed from.
+            self._data = bytearray(self._data)
         return self._data
 
     def size(self) -> int:
@@ -355,6 +508,33 @@ class DataBuffer:
     def type(self) -> DataPrototype:
         return self._type
 
+    def data_bytes(self) -> bytes:
+        return bytes(self._data)
+
+    def copy_from(self, other: "DataBuffer") -> Result[None]:
+        # Copy another buffer's contents in one block copy.
+        if other.size() != self.size():
+            return Result.errorResult(
+                f"Data size mismatch, expected: {self.size()}, got: {other.size()}"
+            )
+        if isinstance(self._data, bytearray):
+            self._data[:] = other._data
+        else:
+            self._data = bytearray(other._data)
+        return _OK_EMPTY
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DataBuffer):
+            return NotImplemented
+        # bytes-like comparison is a single memcmp in C
+        return (
+            self._type.identifier() == other._type.identifier()
+            and self._data == other._data
+        )
+
+    def __ne__(self, other: object) -> bool:
+        return not (self == other)
+
     def __repr__(self) -> str:
         return f"DataBuffer(type={self._type}, data={list(self._data)})"
 
@@ -390,7 +570,16 @@ class MessageType(enum.IntEnum):
         return MessageType.REQUEST
 
 
+# Header wire format: type, prototype handle, big-endian message number.
+_header_struct = struct.Struct(">BBH")
+
+# MessageType members indexed by their wire value, avoiding the enum lookup.
+_MSG_TYPE_LUT = tuple(MessageType)
+
+
 class MessageHeader:
+    __slots__ = ("type", "prototype_handle", "message_number")
+
     def __init__(
         self,
         type_: MessageType = MessageType.REQUEST,
@@ -405,17 +594,19 @@ class MessageHeader:
     def from_serialized(cls, serialized: bytes) -> Result["MessageHeader"]:
         if len(serialized) < 4:
             return Result.errorResult("Message too short: " + str(len(serialized)))
-        type_ = MessageType(serialized[0])
-        prototype_handle = serialized[1]
-        # Combine two bytes into a 16-bit integer (big-endian as in the C++ code)
-        message_number = (serialized[2] << 8) | serialized[3]
-        return Result.ok(cls(type_, prototype_handle, message_number))
+        # The message number is big-endian as in the C++ code.
+        type_val, prototype_handle, message_number = _header_struct.unpack_from(serialized)
+        if type_val >= len(_MSG_TYPE_LUT):
+            return Result.errorResult("Invalid message type: " + str(type_val))
+        return Result.ok(cls(_MSG_TYPE_LUT[type_val], prototype_handle, message_number))
 
     def insert_serialized(self, serialized: bytearray) -> None:
-        serialized.append(self.type.value)
-        serialized.append(self.prototype_handle)
-        serialized.append((self.message_number >> 8) & 0xFF)
-        serialized.append(self.message_number & 0xFF)
+        serialized.extend(self.pack())
+
+    def pack(self) -> bytes:
+        return _header_struct.pack(
+            self.type.value, self.prototype_handle, self.message_number & 0xFFFF
+        )
 
     def __repr__(self) -> str:
         return f"MessageHeader(type={self.type}, prototype_handle={self.prototype_handle}, message_number={self.message_number})"
@@ -430,16 +621,58 @@ class Message:
     _complete_header_size: int = _preamble_size + 4  # 4 bytes for header
     _complete_end_sequence_size: int = _end_sequence_size
     _message_number: int = 0  # auto-incremented
+    _message_pool: List["Message"] = []  # released messages, reused by _from_wire()
+
+    # The header fields are stored on the message itself rather than in a
+    # MessageHeader, which is only built on demand by header().
+    __slots__ = ("_type", "_prototype_handle", "_msg_number", "_buffer")
 
     def __init__(self, header: MessageHeader, buffer: DataBuffer, ignore_warnings: bool = False):
-        self._header = header
+        self._type = header.type
+        self._prototype_handle = header.prototype_handle
+        self._msg_number = header.message_number
         self._buffer = buffer
         # Serve warnings if needed.
-        if not ignore_warnings:
+        if not ignore_warnings and RDSCOM_STRICT_WARNINGS:
             self._serve_message_constructor_warnings(
-                self._buffer.type().identifier(), self._header.type
+                self._buffer.type().identifier(), self._type
             )
 
+    @classmethod
+    def _create(
+        cls,
+        msg_type: MessageType,
+        prototype_handle: int,
+        message_number: int,
+        buffer: DataBuffer,
+        ignore_warnings: bool = False,
+    ) -> "Message":
+        # Build a message from its header fields without an intermediate MessageHeader.
+        message = cls._from_wire(msg_type, prototype_handle, message_number, buffer)
+        if not ignore_warnings and RDSCOM_STRICT_WARNINGS:
+            message._serve_message_constructor_warnings(buffer.type().identifier(), msg_type)
+        return message
+
+    @classmethod
+    def _from_wire(
+        cls,
+        msg_type: MessageType,
+        prototype_handle: int,
+        message_number: int,
+        buffer: DataBuffer,
+    ) -> "Message":
+        # Build a message without the constructor warnings, for messages that are
+        # known to be well-formed (parsed frames and responses).
+        if cls is Message and Message._message_pool:
+            message = Message._message_pool.pop()
+        else:
+            message = cls.__new__(cls)
+        message._type = msg_type
+        message._prototype_handle = prototype_handle
+        message._msg_number = message_number
+        message._buffer = buffer
+        return message
+
     @classmethod
     def _next_message_number(cls) -> int:
         cls._message_number = (cls._message_number + 1) % 0x10000
@@ -454,8 +687,7 @@ class Message:
     ) -> "Message":
         if message_number is None:
             message_number = cls._next_message_number()
-        header = MessageHeader(msg_type, data.type().identifier(), message_number)
-        return cls(header, data)
+        return cls._create(msg_type, data.type().identifier(), message_number, data)
 
     @classmethod
     def from_type_and_proto(
@@ -466,16 +698,14 @@ class Message:
     ) -> "Message":
         if message_number is None:
             message_number = cls._next_message_number()
-        header = MessageHeader(msg_type, proto.identifier(), message_number)
         buffer = DataBuffer(proto)
-        return cls(header, buffer)
+        return cls._create(msg_type, proto.identifier(), message_number, buffer)
 
     @classmethod
     def create_response(cls, request: "Message", data: DataBuffer) -> "Message":
-        header = MessageHeader(
-            MessageType.RESPONSE, data.type().identifier(), request.message_number()
+        return cls._from_wire(
+            MessageType.RESPONSE, data.type().identifier(), request.message_number(), data
         )
-        return cls(header, data)
 
     @classmethod
     def get_prototype_handle_from_buffer(cls, serialized: bytes) -> int:
@@ -498,34 +728,64 @@ class Message:
         # Check end sequence
         if serialized[-cls._end_sequence_size :] != cls._end_sequence:
             return Result.errorResult("Invalid end sequence")
-        # Extract header bytes
-        header_bytes = serialized[cls._preamble_size : cls._preamble_size + 4]
-        header_res = MessageHeader.from_serialized(header_bytes)
-        if header_res.is_error():
+        # The payload is read in place, so only keep a view of immutable input.
+        if not isinstance(serialized, bytes):
+            serialized = bytes(serialized)
+        return cls._from_frame(proto, serialized)
+
+    @classmethod
+    def _from_frame(
+        cls, proto: DataPrototype, serialized: Union[bytes, bytearray, memoryview]
+    ) -> Result["Message"]:
+        # Parse a frame already known to start with the preamble and end with the
+        # end sequence, such as the frames CommunicationInterface.listen() cuts out.
+        if len(serialized) < cls._complete_header_size:
             return Result.errorResult("Failed to create message header")
-        header = header_res.value()
-        expected_size = (
-            cls._complete_header_size + proto.size() + cls._complete_end_sequence_size
+        type_val, prototype_handle, message_number = _header_struct.unpack_from(
+            serialized, cls._preamble_size
         )
-        if len(serialized) != expected_size:
+        if type_val >= len(_MSG_TYPE_LUT):
+            return Result.errorResult("Invalid message type: " + str(type_val))
+        if len(serialized) != proto._frame_size:
             return Result.errorResult(
-                f"Message size mismatch, expected: {expected_size}, got: {len(serialized)}"
+                f"Message size mismatch, expected: {proto._frame_size}, got: {len(serialized)}"
             )
-        data_bytes = serialized[
-            cls._complete_header_size : -cls._complete_end_sequence_size
-        ]
-        buffer_res = DataBuffer.create_from_prototype(proto, data_bytes)
+        data_view = memoryview(serialized)[cls._complete_header_size : proto._end_slice_start]
+        buffer_res = DataBuffer.from_view(proto, data_view)
         if buffer_res.is_error():
             return Result.errorResult("Failed to create data buffer")
-        return Result.ok(cls(header, buffer_res.value(), ignore_warnings=True))
+        return Result.ok(
+            cls._from_wire(
+                _MSG_TYPE_LUT[type_val], prototype_handle, message_number, buffer_res.value()
+            )
+        )
 
     def serialize(self) -> bytearray:
-        serialized = bytearray()
-        serialized.extend(Message._preamble)
-        self._header.insert_serialized(serialized)
-        serialized.extend(self._buffer.data())
-        serialized.extend(Message._end_sequence)
-        return serialized
+        # join sizes the frame up front, so it is allocated once and filled in one pass.
+        return bytearray().join(
+            (
+                Message._preamble,
+                _header_struct.pack(
+                    self._type.value, self._prototype_handle, self._msg_number & 0xFFFF
+                ),
+                self._buffer._data,
+                Message._end_sequence,
+            )
+        )
+
+    def release(self) -> None:
+        # Hand the message (and its buffer, if pooled) back for reuse once it has
+        # been processed. It must not be used afterwards. Messages that are never
+        # released are simply garbage collected. Requests passed to callbacks as
+        # they are sent are still held by the interface for retries; don't
+        # release those.
+        if self._buffer is None:
+            return
+        if self._buffer._pooled:
+            self._buffer.type().release_buffer(self._buffer)
+        self._buffer = None
+        if type(self) is Message and len(Message._message_pool) < MESSAGE_POOL_SIZE:
+            Message._message_pool.append(self)
 
     def get_field(self, name: str) -> Result[Any]:
         return self._buffer.get_field(name)
@@ -533,14 +793,26 @@ class Message:
     def set_field(self, name: str, value: Any) -> Result[Any]:
         return self._buffer.set_field(name, value)
 
+    def set_field_strict(self, name: str, value: Any) -> None:
+        self._buffer.set_field_strict(name, value)
+
+    def set_fields(self, **values: Any) -> Result[None]:
+        return self._buffer.set_fields(**values)
+
     def type(self) -> MessageType:
-        return self._header.type
+        return self._type
+
+    def header(self) -> MessageHeader:
+        return MessageHeader(self._type, self._prototype_handle, self._msg_number)
 
     def data(self) -> DataBuffer:
         return self._buffer
 
+    def raw_buffer(self) -> bytearray:
+        return self._buffer.data()
+
     def message_number(self) -> int:
-        return self._header.message_number
+        return self._msg_number
 
     def print_clean(self, output=sys.stdout) -> None:
         serialized = self.serialize()
@@ -583,17 +855,17 @@ class Message:
         if not isinstance(other, Message):
             return NotImplemented
         return (
-            self._header.type == other._header.type
-            and self._header.prototype_handle == other._header.prototype_handle
-            and self._header.message_number == other._header.message_number
-            and self._buffer.data() == other._buffer.data()
+            self._type == other._type
+            and self._prototype_handle == other._prototype_handle
+            and self._msg_number == other._msg_number
+            and self._buffer == other._buffer
         )
 
     def __ne__(self, other: object) -> bool:
         return not (self == other)
 
     def __repr__(self) -> str:
-        return f"Message(header={self._header}, buffer={self._buffer})"
+        return f"Message(header={self.header()}, buffer={self._buffer})"
 
 
 # ---------------------------------------------------------------------------
@@ -604,6 +876,11 @@ from abc import ABC, abstractmethod
 
 
 class CommunicationChannel(ABC):
+    # Set by channels that are finished with a message once send() returns
+    # (for example, because they serialize it straight away). Only then does
+    # CommunicationInterface.send_built() recycle the message it sent.
+    serializes_on_send: bool = False
+
     @abstractmethod
     def receive(self) -> bytearray:
         pass
@@ -612,23 +889,40 @@ class CommunicationChannel(ABC):
     def send(self, message: Message) -> None:
         pass
 
+    def wait(self, timeout: float) -> bool:
+        # Block until data may be available or the timeout (in seconds) expires.
+        # Channels without a readiness signal simply wait out the timeout.
+        time.sleep(timeout)
+        return True
+
 
 # DummyChannel implementation for testing
 class DummyChannel(CommunicationChannel):
+    serializes_on_send = True
+
     def __init__(self):
         self._data = bytearray()
+        self._ready = threading.Event()
 
     def receive(self) -> bytearray:
         if not self._data:
             return bytearray()
-        debug_println("[DummyChannel] Received data of size %d", len(self._data))
-        data = self._data[:]
-        self._data.clear()
+        if RDSCOM_DEBUG_ENABLED:
+            debug_println("[DummyChannel] Received data of size %d", len(self._data))
+        # Clear before taking the buffer, so data sent in between sets it again.
+        self._ready.clear()
+        # Hand the filled buffer over to the caller instead of copying it.
+        data = self._data
+        self._data = bytearray()
         return data
 
     def send(self, message: Message) -> None:
         serialized = message.serialize()
         self._data.extend(serialized)
+        self._ready.set()
+
+    def wait(self, timeout: float) -> bool:
+        return self._ready.wait(timeout)
 
 
 # (If you were on Arduino you would create a SerialCommunicationChannel here.)
@@ -639,6 +933,8 @@ class DummyChannel(CommunicationChannel):
 # Type aliases for clarity.
 CallBackList = List[Callable[[Message], None]]
 CallBackMap = Dict[int, CallBackList]
+# Flat dispatch table indexed by (prototype handle << 2) | message type.
+CallBackTable = List[Optional[CallBackList]]
 
 
 class CommunicationInterfaceOptions:
@@ -651,10 +947,10 @@ class CommunicationInterfaceOptions:
         self.max_retries = max_retries
         self.retry_timeout = retry_timeout
         if time_function is None:
-            # Default time function: milliseconds since epoch.
-            self.time_function = lambda: int(time.time() * 1000)
+            # Default time function: milliseconds from a monotonic clock.
+            self.time_function = lambda: time.monotonic_ns() // 1_000_000
             debug_print_errorln(
-                "No time function set for CommunicationInterfaceOptions, using default time.time() based function"
+                "No time function set for CommunicationInterfaceOptions, using default time.monotonic_ns() based function"
             )
         else:
             self.time_function = time_function
@@ -662,10 +958,13 @@ class CommunicationInterfaceOptions:
 
 class CommunicationInterface:
     class SentMessage:
+        __slots__ = ("message", "time_sent", "num_retries", "schedule_seq")
+
         def __init__(self, message: Message, time_sent: int, num_retries: int):
             self.message = message
             self.time_sent = time_sent
             self.num_retries = num_retries
+            self.schedule_seq = -1  # sequence number of the live heap entry, set by _schedule_retry
 
     def __init__(
         self,
@@ -679,9 +978,20 @@ class CommunicationInterface:
         self._rx_callbacks: CallBackMap = {}
         self._tx_callbacks: CallBackMap = {}
         self._err_callbacks: CallBackMap = {}
-        self._prototypes: Dict[int, DataPrototype] = {}
+        self._dispatch: CallBackTable = []
+        # callback maps indexed by MessageType value
+        self._callback_maps = (self._rx_callbacks, self._tx_callbacks, self._err_callbacks)
+        # prototypes indexed directly by their (small, dense) identifier
+        self._prototypes: List[Optional[DataPrototype]] = []
+        # the prototype of the last received message, as most links only carry a few
+        self._last_proto_handle: int = -1
+        self._last_proto: Optional[DataPrototype] = None
         self._acks_needed: Dict[int, CommunicationInterface.SentMessage] = {}
-        self._last_message_time: int = 0
+        # min-heap of (retry deadline, schedule sequence, message number) for
+        # messages awaiting an ack; the sequence tells a live entry from stale ones
+        self._retry_deadlines: List[Tuple[int, int, int]] = []
+        self._retry_seq: int = 0
+        self.last_received_ms: int = 0  # time_function() timestamp of the last received message
         self._on_failure_callbacks : CallBackMap = {} # for when messages fail to send
         self._on_success_callbacks : CallBackMap = {} # for when messages are successfully sent
         self._old_data = b""
@@ -693,6 +1003,17 @@ class CommunicationInterface:
         if type_ not in callback_map:
             callback_map[type_] = []
         callback_map[type_].append(callback)
+        # Mirror the callback list into the flat dispatch table so that
+        # incoming messages can be routed with a single list index. Handles that
+        # do not fit in a byte can never be received, so they stay in the map only.
+        if not 0 <= type_ <= 0xFF:
+            return self
+        # use the index of the map _get_map picked, so unknown types match it
+        map_index = msg_type if 0 <= msg_type < len(self._callback_maps) else 0
+        key = (type_ << 2) | map_index
+        if key >= len(self._dispatch):
+            self._dispatch.extend([None] * (key + 1 - len(self._dispatch)))
+        self._dispatch[key] = callback_map[type_]
         return self
 
     def add_prototype(self, proto: DataPrototype) -> "CommunicationInterface":
@@ -703,28 +1024,45 @@ class CommunicationInterface:
                 RESERVED_ERROR_PROTOTYPE,
             )
             return self
+        if handle < 0 or handle > 0xFF:
+            debug_print_errorln(
+                "Invalid prototype: identifier %d does not fit in a byte", handle
+            )
+            return self
+        if handle >= len(self._prototypes):
+            self._prototypes.extend([None] * (handle + 1 - len(self._prototypes)))
         self._prototypes[handle] = proto
+        self._last_proto_handle = -1
         return self
 
     def tick(self) -> None:
         self.listen()
-        # now check for acks
+        # now check for acks, popping only the messages whose retry deadline has passed
+        to_retry: List[CommunicationInterface.SentMessage] = []
         to_remove: List[int] = []
         current_time = self._options.time_function()
-        for message_number, sent_msg in self._acks_needed.items():
-            time_since_sent = current_time - sent_msg.time_sent
-            if time_since_sent > self._options.retry_timeout:
-                if sent_msg.num_retries < self._options.max_retries:
+        while self._retry_deadlines and self._retry_deadlines[0][0] < current_time:
+            _, seq, message_number = heapq.heappop(self._retry_deadlines)
+            sent_msg = self._acks_needed.get(message_number)
+            # skip entries for messages that were acked or rescheduled since
+            if sent_msg is None or sent_msg.schedule_seq != seq:
+                continue
+            if sent_msg.num_retries < self._options.max_retries:
+                if RDSCOM_DEBUG_ENABLED:
                     debug_println(
                         "Retrying message number %d after %d ms",
                         message_number,
-                        time_since_sent,
+                        current_time - sent_msg.time_sent,
                     )
-                    self.send_message(sent_msg.message, ack_required=False)
-                    sent_msg.time_sent = self._options.time_function()
-                    sent_msg.num_retries += 1
-                else:
-                    to_remove.append(message_number)
+                self.send_message(sent_msg.message, ack_required=False)
+                sent_msg.time_sent = self._options.time_function()
+                sent_msg.num_retries += 1
+                to_retry.append(sent_msg)
+            else:
+                to_remove.append(message_number)
+        # reschedule after the loop so that each message is retried at most once per tick
+        for sent_msg in to_retry:
+            self._schedule_retry(sent_msg)
         for message_number in to_remove:
             debug_println(
                 "Removing message number %d -- failed to get an ack before the timeout",
@@ -743,14 +1081,22 @@ class CommunicationInterface:
             return
         
         if len(self._old_data) > 0:
-            debug_println("Old data: %s", self._old_data)
-            debug_println("New data: %s", data)
+            if RDSCOM_DEBUG_ENABLED:
+                debug_println("Old data: %s", self._old_data)
+                debug_println("New data: %s", data)
 
-        # append the old data to the new data
-        data = self._old_data + data
+            # append the new data to the old data
+            data = self._old_data + data
+        else:
+            # Received messages keep views into this buffer, so take a copy the
+            # channel cannot modify.
+            data = bytes(data)
         
-        # find all of the parts of the message that start with the preamble
+        # find all of the parts of the message that start with the preamble,
+        # handing each one off as a memoryview slice rather than a copy
+        view = memoryview(data)
         preamble_start = 0
+        consumed = 0  # end of the last complete message
         while preamble_start < len(data):
             preamble_start = data.find(Message._preamble, preamble_start)
             if preamble_start == -1:
@@ -759,47 +1105,58 @@ class CommunicationInterface:
             end_sequence_start = data.find(Message._end_sequence, preamble_start)
             if end_sequence_start == -1:
                 break
-            message_data = data[preamble_start : end_sequence_start + Message._end_sequence_size]
+            message_data = view[preamble_start : end_sequence_start + Message._end_sequence_size]
             preamble_start = end_sequence_start + Message._end_sequence_size
+            consumed = preamble_start
             self._handle_message(message_data)
 
-        # find the last END sequence
-        last_end_sequence_start = data.rfind(Message._end_sequence)
+        # find the last END sequence, only scanning past the messages handled above
+        last_end_sequence_start = data.rfind(Message._end_sequence, consumed)
         if last_end_sequence_start == -1:
-            # there was no END sequence, so the whole data is old data
-            self._old_data = data
+            # there was no END sequence after the last message, so the rest is old data
+            self._old_data = data[consumed:] if consumed else data
         else:
             # the old data is everything after the last END sequence
             self._old_data = data[last_end_sequence_start + Message._end_sequence_size:]
-        debug_println("Old data: %s", self._old_data)
+        if RDSCOM_DEBUG_ENABLED:
+            debug_println("Old data: %s", self._old_data)
 
             
-    def _handle_message(self, data: bytes) -> None:
+    def _handle_message(self, data: memoryview) -> None:
         # print out the data
-        debug_println("Received data of size %d", len(data))
-        debug_println("Data: %s", data)
+        if RDSCOM_DEBUG_ENABLED:
+            debug_println("Received data of size %d", len(data))
+            debug_println("Data: %s", bytes(data))
     
         proto_handle = Message.get_prototype_handle_from_buffer(data)
-        if proto_handle not in self._prototypes:
-            debug_print_errorln(
-                "No prototype found for message with handle %d", proto_handle
-            )
-            return
-        proto = self._prototypes[proto_handle]
-        message_res = Message.from_serialized(proto, data)
+        if proto_handle == self._last_proto_handle:
+            proto = self._last_proto
+        else:
+            proto = self._find_prototype(proto_handle)
+            if proto is None:
+                debug_print_errorln(
+                    "No prototype found for message with handle %d", proto_handle
+                )
+                return
+            self._last_proto_handle = proto_handle
+            self._last_proto = proto
+        # listen() cut this frame at a preamble and an end sequence, so skip
+        # checking them again
+        message_res = Message._from_frame(proto, data)
         if message_res.is_error():
             debug_print_errorln(
                 "Failed to deserialize message: %s", message_res.error()
             )
             return
         message = message_res.value()
-        debug_println(
-            "Received message of prototype %d, message number %d, message type %d",
-            proto_handle,
-            message.message_number(),
-            message.type(),
-        )
-        self._last_message_time = self._options.time_function()
+        if RDSCOM_DEBUG_ENABLED:
+            debug_println(
+                "Received message of prototype %d, message number %d, message type %d",
+                proto_handle,
+                message.message_number(),
+                message.type(),
+            )
+        self.last_received_ms = self._options.time_function()
         if message.type() == MessageType.RESPONSE:
             if message.message_number() in self._acks_needed:
                 # call the on_success callback
@@ -807,10 +1164,15 @@ class CommunicationInterface:
                     self._on_success_callbacks[message.message_number()](message)
 
                 del self._acks_needed[message.message_number()]
-        callback_map = self._get_map(message.type())
-        if proto_handle in callback_map:
-            for callback in callback_map[proto_handle]:
-                callback(message)
+                if not self._acks_needed:
+                    # every remaining deadline is stale, drop them all at once
+                    self._retry_deadlines.clear()
+        key = (proto_handle << 2) | message.type()
+        if key < len(self._dispatch):
+            callbacks = self._dispatch[key]
+            if callbacks is not None:
+                for callback in callbacks:
+                    callback(message)
 
     def send_message(self, message: Message, ack_required: bool = False, on_failure : callable = None, on_success : callable = None) -> None:
         self._channel.send(message)
@@ -820,13 +1182,14 @@ class CommunicationInterface:
                     message, self._options.time_function(), 0
                 )
             )
+            self._schedule_retry(self._acks_needed[message.message_number()])
 
             # call the tx callbacks, if this is the first time the message is being sent
             acks_needed = self._acks_needed[message.message_number()]
             if acks_needed.num_retries == 0:
-                callback_map = self._get_map(message.type())
-                if message.data().type().identifier() in callback_map:
-                    for callback in callback_map[message.data().type().identifier()]:
+                key = (message.data().type().identifier() << 2) | message.type()
+                if key < len(self._dispatch) and self._dispatch[key] is not None:
+                    for callback in self._dispatch[key]:
                         callback(message)
 
                 # also add the on_failure callback
@@ -842,19 +1205,64 @@ class CommunicationInterface:
 
         # call the tx callbacks
 
+    def send_built(
+        self,
+        type_: int,
+        msg_type: MessageType,
+        values: Sequence[Any],
+        ack_required: bool = False,
+        message_number: Optional[int] = None,
+        on_failure: callable = None,
+        on_success: callable = None,
+    ) -> Result[None]:
+        # Pack the field values (in field order) for prototype type_ straight into
+        # a pooled buffer and send it. Pass the request's message number to
+        # send a response.
+        proto = self._find_prototype(type_)
+        if proto is None:
+            return Result.errorResult("Prototype not found")
+        buffer_res = proto.build(*values)
+        if buffer_res.is_error():
+            return Result.errorResult(buffer_res.error())
+        if message_number is None:
+            message_number = Message._next_message_number()
+        message = Message._from_wire(msg_type, type_, message_number, buffer_res.value())
+        self.send_message(message, ack_required, on_failure, on_success)
+        # The message never leaves send_built, so recycle it unless the channel
+        # may still hold it or it is kept for retries.
+        if self._channel.serializes_on_send:
+            sent_msg = self._acks_needed.get(message_number)
+            if sent_msg is None or sent_msg.message is not message:
+                message.release()
+        return _OK_EMPTY
+
+    def _schedule_retry(self, sent_msg: "CommunicationInterface.SentMessage") -> None:
+        self._retry_seq += 1
+        sent_msg.schedule_seq = self._retry_seq
+        heapq.heappush(
+            self._retry_deadlines,
+            (
+                sent_msg.time_sent + self._options.retry_timeout,
+                self._retry_seq,
+                sent_msg.message.message_number(),
+            ),
+        )
+
     def get_prototype(self, identifier: int) -> Result[DataPrototype]:
-        if identifier not in self._prototypes:
+        proto = self._find_prototype(identifier)
+        if proto is None:
             return Result.errorResult("Prototype not found")
-        return Result.ok(self._prototypes[identifier])
+        return Result.ok(proto)
+
+    def _find_prototype(self, identifier: int) -> Optional[DataPrototype]:
+        if 0 <= identifier < len(self._prototypes):
+            return self._prototypes[identifier]
+        return None
 
     def time_since_last_received(self) -> int:
-        return self._options.time_function() - self._last_message_time
+        return self._options.time_function() - self.last_received_ms
 
     def _get_map(self, msg_type: MessageType) -> CallBackMap:
-        if msg_type == MessageType.REQUEST:
-            return self._rx_callbacks
-        elif msg_type == MessageType.RESPONSE:
-            return self._tx_callbacks
-        elif msg_type == MessageType.ERROR:
-            return self._err_callbacks
+        if 0 <= msg_type < len(self._callback_maps):
+            return self._callback_maps[msg_type]
         return self._rx_callbacks